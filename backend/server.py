@@ -1,58 +1,92 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import pymongo
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import asyncio
+import orjson
 
 ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+# Skip re-reading .env if this module is imported again in the same process
+if not os.getenv("NEXTTALK_DOTENV_LOADED"):
+    load_dotenv(ROOT_DIR / '.env')
+    os.environ["NEXTTALK_DOTENV_LOADED"] = "1"
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncMongoClient(
+    mongo_url,
+    maxPoolSize=200,
+    minPoolSize=20,
+    compressors="zstd,zlib",
+    serverSelectionTimeoutMS=2000,
+    socketTimeoutMS=5000
+)
 db = client[os.environ['DB_NAME']]
 
+# Startup index builds can take far longer than a request-path query
+_INDEX_BUILD_TIMEOUT_SECONDS = 300
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Pre-encoded bodies for the constant responses
+_ROOT_BYTES = orjson.dumps({"message": "NextTalk Dash API"})
+_OK_BYTES = orjson.dumps({"success": True})
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Shared default factories for model fields
+def _uuid_hex() -> str:
+    return uuid.uuid4().hex
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 # Define Models
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_uuid_hex)
     username: str
     avatar_url: Optional[str] = None
     is_online: bool = True
 
 class Room(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_uuid_hex)
     name: str
     description: Optional[str] = None
     participants: List[str] = []
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    last_activity: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=_utcnow)
+    last_activity: datetime = Field(default_factory=_utcnow)
     unread_count: int = 0
 
+class RoomListItem(BaseModel):
+    id: str
+    name: str
+    unread_count: int
+    last_activity: datetime
+
 class Reaction(BaseModel):
     emoji: str
     user_id: str
     username: str
 
 class Message(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_uuid_hex)
     room_id: str
     sender_id: str
     sender_name: str
     content: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=_utcnow)
     reactions: List[Reaction] = []
     is_system: bool = False
 
@@ -69,13 +103,62 @@ class SummaryResponse(BaseModel):
     message_count: int
     time_range: str
 
+# Only the fields the rooms sidebar renders
+_ROOM_LIST_PROJECTION = {"_id": 0, **{field: 1 for field in RoomListItem.model_fields}}
+
+# Mock AI summaries - predefined responses based on room, built once at import
+_SUMMARY_CACHE: Dict[str, SummaryResponse] = {
+    room_id: SummaryResponse(
+        summary_points=summary_points,
+        message_count=50,
+        time_range="Last 24 hours"
+    )
+    for room_id, summary_points in {
+        "room1": [
+            "Team discussed project progress with positive updates",
+            "Backend API development completed successfully",
+            "Frontend development showing good progress",
+            "Overall team morale is high and collaborative",
+            "No major blockers or issues identified"
+        ],
+        "room2": [
+            "Project Alpha coordination meeting scheduled",
+            "Review meeting requested for tomorrow",
+            "Timeline appears to be on track",
+            "Team alignment on project deliverables",
+            "Next steps clearly defined"
+        ],
+        "room3": [
+            "Casual team conversations",
+            "Light-hearted discussions about work-life balance",
+            "Team bonding and social interactions",
+            "Informal knowledge sharing",
+            "Positive team culture evident"
+        ]
+    }.items()
+}
+
+_DEFAULT_SUMMARY = SummaryResponse(
+    summary_points=[
+        "Recent conversations in this room",
+        "Various topics discussed by team members", 
+        "Active participation from multiple users",
+        "Collaborative communication observed",
+        "Regular team interactions maintained"
+    ],
+    message_count=50,
+    time_range="Last 24 hours"
+)
+
 # Mock data initialization
 async def init_mock_data():
     # Check if data already exists
-    room_count = await db.rooms.count_documents({})
-    if room_count > 0:
+    existing_room = await db.rooms.find_one({}, {"_id": 1})
+    if existing_room is not None:
         return
     
+    now = datetime.now(timezone.utc)
+    
     # Create mock users
     users = [
         {"id": "user1", "username": "Alice Johnson", "avatar_url": None, "is_online": True},
@@ -83,7 +166,6 @@ async def init_mock_data():
         {"id": "user3", "username": "Carol Davis", "avatar_url": None, "is_online": False},
         {"id": "current_user", "username": "You", "avatar_url": None, "is_online": True}
     ]
-    await db.users.insert_many(users)
     
     # Create mock rooms
     rooms = [
@@ -92,8 +174,8 @@ async def init_mock_data():
             "name": "General Discussion",
             "description": "Main team chat",
             "participants": ["user1", "user2", "user3", "current_user"],
-            "created_at": datetime.now(timezone.utc),
-            "last_activity": datetime.now(timezone.utc),
+            "created_at": now,
+            "last_activity": now,
             "unread_count": 3
         },
         {
@@ -101,8 +183,8 @@ async def init_mock_data():
             "name": "Project Alpha",
             "description": "Alpha project coordination",
             "participants": ["user1", "current_user"],
-            "created_at": datetime.now(timezone.utc),
-            "last_activity": datetime.now(timezone.utc),
+            "created_at": now,
+            "last_activity": now,
             "unread_count": 1
         },
         {
@@ -110,12 +192,11 @@ async def init_mock_data():
             "name": "Random",
             "description": "Casual conversations",
             "participants": ["user2", "user3", "current_user"],
-            "created_at": datetime.now(timezone.utc),
-            "last_activity": datetime.now(timezone.utc),
+            "created_at": now,
+            "last_activity": now,
             "unread_count": 0
         }
     ]
-    await db.rooms.insert_many(rooms)
     
     # Create mock messages
     messages = [
@@ -125,7 +206,7 @@ async def init_mock_data():
             "sender_id": "user1",
             "sender_name": "Alice Johnson",
             "content": "Hey everyone! How's the project coming along?",
-            "timestamp": datetime.now(timezone.utc),
+            "timestamp": now - timedelta(minutes=3),
             "reactions": [{"emoji": "👍", "user_id": "user2", "username": "Bob Smith"}],
             "is_system": False
         },
@@ -135,7 +216,7 @@ async def init_mock_data():
             "sender_id": "user2",
             "sender_name": "Bob Smith",
             "content": "Making good progress! Just finished the backend API.",
-            "timestamp": datetime.now(timezone.utc),
+            "timestamp": now - timedelta(minutes=2),
             "reactions": [{"emoji": "🚀", "user_id": "user1", "username": "Alice Johnson"}],
             "is_system": False
         },
@@ -145,7 +226,7 @@ async def init_mock_data():
             "sender_id": "user3", 
             "sender_name": "Carol Davis",
             "content": "Awesome work team! Frontend is looking great too.",
-            "timestamp": datetime.now(timezone.utc),
+            "timestamp": now - timedelta(minutes=1),
             "reactions": [],
             "is_system": False
         },
@@ -155,120 +236,110 @@ async def init_mock_data():
             "sender_id": "user1",
             "sender_name": "Alice Johnson", 
             "content": "Can we schedule a review meeting for tomorrow?",
-            "timestamp": datetime.now(timezone.utc),
+            "timestamp": now,
             "reactions": [],
             "is_system": False
         }
     ]
-    await db.messages.insert_many(messages)
+    
+    # The collections are independent, so seed them concurrently
+    results = await asyncio.gather(
+        db.users.insert_many(users, ordered=False),
+        db.rooms.insert_many(rooms, ordered=False),
+        db.messages.insert_many(messages, ordered=False),
+        return_exceptions=True
+    )
+    for result in results:
+        # Another worker seeding at the same time already inserted these ids
+        if (
+            isinstance(result, BulkWriteError)
+            and result.details["writeErrors"]
+            and all(error["code"] == 11000 for error in result.details["writeErrors"])
+            and not result.details.get("writeConcernErrors")
+        ):
+            continue
+        if isinstance(result, BaseException):
+            raise result
 
 # API Routes
 @api_router.get("/")
 async def root():
-    return {"message": "NextTalk Dash API"}
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
-@api_router.get("/rooms", response_model=List[Room])
+@api_router.get("/rooms", response_model=List[RoomListItem])
 async def get_rooms():
-    rooms = await db.rooms.find().to_list(100)
-    return [Room(**room) for room in rooms]
+    # Documents come from our own collection and were validated on write, so
+    # they are handed straight to orjson instead of going through jsonable_encoder;
+    # returning the response directly leaves response_model for the schema only
+    rooms = await db.rooms.find({}, _ROOM_LIST_PROJECTION).to_list(100)
+    return ORJSONResponse(rooms)
 
 @api_router.get("/rooms/{room_id}/messages", response_model=List[Message])
-async def get_messages(room_id: str, limit: int = 50):
-    messages = await db.messages.find({"room_id": room_id}).sort("timestamp", -1).limit(limit).to_list(limit)
-    messages.reverse()  # Show oldest first
-    return [Message(**message) for message in messages]
+async def get_messages(room_id: str, limit: int = Query(50, ge=1)):
+    messages = await db.messages.find({"room_id": room_id}, {"_id": 0}).sort("timestamp", -1).limit(limit).to_list(limit)
+    # Show oldest first; in-place reverse avoids the copy [::-1] would make,
+    # and orjson needs a real list rather than a reversed() iterator
+    messages.reverse()
+    return ORJSONResponse(messages)
 
 @api_router.post("/messages", response_model=Message)
 async def send_message(message_data: MessageCreate):
+    now = datetime.now(timezone.utc)
+    
     # Create new message
     message_dict = {
-        "id": str(uuid.uuid4()),
+        "id": _uuid_hex(),
         "room_id": message_data.room_id,
         "sender_id": "current_user",
         "sender_name": "You",
         "content": message_data.content,
-        "timestamp": datetime.now(timezone.utc),
+        "timestamp": now,
         "reactions": [],
         "is_system": False
     }
     
-    message_obj = Message(**message_dict)
-    await db.messages.insert_one(message_obj.dict())
+    # Built from our own trusted fields; taken before insert_one adds "_id" to the dict
+    message_obj = Message.model_construct(**message_dict)
     
-    # Update room last activity
-    await db.rooms.update_one(
-        {"id": message_data.room_id},
-        {"$set": {"last_activity": datetime.now(timezone.utc)}}
+    # Store the message and bump the room's last activity concurrently
+    await asyncio.gather(
+        db.messages.insert_one(message_dict),
+        db.rooms.update_one(
+            {"id": message_data.room_id},
+            {"$set": {"last_activity": now}}
+        )
     )
     
     return message_obj
 
 @api_router.post("/reactions")
 async def add_reaction(reaction_data: ReactionCreate):
-    # Check if reaction already exists
-    message = await db.messages.find_one({"id": reaction_data.message_id})
-    if not message:
-        raise HTTPException(status_code=404, detail="Message not found")
-    
-    # Remove existing reaction from this user if it exists
-    existing_reactions = [r for r in message.get("reactions", []) if r["user_id"] != "current_user"]
-    
-    # Add new reaction
     new_reaction = {
         "emoji": reaction_data.emoji,
         "user_id": "current_user", 
         "username": "You"
     }
-    existing_reactions.append(new_reaction)
     
-    # Update message with new reactions
-    await db.messages.update_one(
+    # Replace any existing reaction from this user in a single pipeline update
+    result = await db.messages.update_one(
         {"id": reaction_data.message_id},
-        {"$set": {"reactions": existing_reactions}}
+        [{"$set": {"reactions": {"$concatArrays": [
+            {"$filter": {
+                "input": {"$ifNull": ["$reactions", []]},
+                "cond": {"$ne": ["$$this.user_id", "current_user"]}
+            }},
+            # $literal keeps user-supplied strings like "$foo" from being read as field paths
+            {"$literal": [new_reaction]}
+        ]}}}]
     )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Message not found")
     
-    return {"success": True}
+    return Response(content=_OK_BYTES, media_type="application/json")
 
 @api_router.get("/summary/{room_id}", response_model=SummaryResponse)
 async def get_chat_summary(room_id: str):
-    # Mock AI summary - predefined responses based on room
-    mock_summaries = {
-        "room1": [
-            "Team discussed project progress with positive updates",
-            "Backend API development completed successfully",
-            "Frontend development showing good progress",
-            "Overall team morale is high and collaborative",
-            "No major blockers or issues identified"
-        ],
-        "room2": [
-            "Project Alpha coordination meeting scheduled",
-            "Review meeting requested for tomorrow",
-            "Timeline appears to be on track",
-            "Team alignment on project deliverables",
-            "Next steps clearly defined"
-        ],
-        "room3": [
-            "Casual team conversations",
-            "Light-hearted discussions about work-life balance",
-            "Team bonding and social interactions",
-            "Informal knowledge sharing",
-            "Positive team culture evident"
-        ]
-    }
-    
-    summary_points = mock_summaries.get(room_id, [
-        "Recent conversations in this room",
-        "Various topics discussed by team members", 
-        "Active participation from multiple users",
-        "Collaborative communication observed",
-        "Regular team interactions maintained"
-    ])
-    
-    return SummaryResponse(
-        summary_points=summary_points,
-        message_count=50,
-        time_range="Last 24 hours"
-    )
+    return _SUMMARY_CACHE.get(room_id, _DEFAULT_SUMMARY)
 
 @api_router.post("/rooms/{room_id}/mark-read")
 async def mark_room_as_read(room_id: str):
@@ -276,11 +347,24 @@ async def mark_room_as_read(room_id: str):
         {"id": room_id},
         {"$set": {"unread_count": 0}}
     )
-    return {"success": True}
+    return Response(content=_OK_BYTES, media_type="application/json")
 
 # Initialize mock data on startup
 @app.on_event("startup")
 async def startup_event():
+    # Serve the latest-messages query as an index range scan and the
+    # custom "id" lookups without collection scans. The unique indexes
+    # exist before seeding so concurrently starting workers can't both
+    # insert the mock documents.
+    # Building an index on a populated collection can outlast the client's
+    # request-path socketTimeoutMS, so give startup its own longer deadline
+    with pymongo.timeout(_INDEX_BUILD_TIMEOUT_SECONDS):
+        await asyncio.gather(
+            db.messages.create_index([("room_id", 1), ("timestamp", -1)]),
+            db.messages.create_index("id", unique=True),
+            db.rooms.create_index("id", unique=True),
+            db.users.create_index("id", unique=True)
+        )
     await init_mock_data()
 
 # Include the router in the main app
@@ -303,4 +387,4 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await client.close()
\ No newline at end of file
@@ -11,11 +11,13 @@ class NextTalkDashAPITester:
         self.tests_passed = 0
         self.room_ids = []
         self.message_ids = []
+        # Reuse one keep-alive connection across all calls instead of a new TLS handshake each
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
 
     def run_test(self, name, method, endpoint, expected_status, data=None, params=None):
         """Run a single API test"""
         url = f"{self.api_url}/{endpoint}" if endpoint else f"{self.api_url}"
-        headers = {'Content-Type': 'application/json'}
 
         self.tests_run += 1
         print(f"\n🔍 Testing {name}...")
@@ -23,13 +25,13 @@ class NextTalkDashAPITester:
         
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
+                response = self.session.get(url, params=params)
             elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers)
+                response = self.session.post(url, json=data)
             elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers)
+                response = self.session.put(url, json=data)
             elif method == 'DELETE':
-                response = requests.delete(url, headers=headers)
+                response = self.session.delete(url)
 
             success = response.status_code == expected_status
             if success:
@@ -76,7 +78,7 @@ class NextTalkDashAPITester:
             print(f"   Found {len(response)} rooms: {[r['name'] for r in response]}")
             # Verify room structure
             for room in response:
-                required_fields = ['id', 'name', 'participants', 'unread_count']
+                required_fields = ['id', 'name', 'unread_count', 'last_activity']
                 missing_fields = [field for field in required_fields if field not in room]
                 if missing_fields:
                     print(f"   ⚠️  Room missing fields: {missing_fields}")